@@ -3,9 +3,26 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import io
 import base64
+import functools
+import time
+import os
+import uuid
+from pathlib import Path
+
+import pedidos_core as core
+
+# Início da execução, para medir a latência de cada rerun
+inicio_execucao = time.perf_counter()
+
+# Medição de latência dos reruns (somente para diagnóstico: PEDIDOS_DEBUG_LATENCIA=1)
+DEBUG_LATENCIA = os.environ.get("PEDIDOS_DEBUG_LATENCIA") == "1"
+
+# Pasta base do arquivo de registros encerrados (Parquet particionado por mês).
+# Cada conjunto de dados (ID gravado no backup) tem sua própria subpasta.
+ARQUIVO_BASE = os.environ.get("PEDIDOS_ARQUIVO_DIR", "arquivo")
 
 # Configuração da página
 st.set_page_config(
@@ -83,89 +100,76 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Função para salvar dados como Excel
+# Pasta do arquivo do conjunto de dados desta sessão
+def pasta_arquivo():
+    return core.dataset_archive_dir(ARQUIVO_BASE, st.session_state.conjunto_id)
+
+# Função para salvar dados como Excel; o backup leva também os registros arquivados
 def save_data_to_excel():
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        # Salvar cada aba em uma planilha separada
-        st.session_state.pedidos_df.to_excel(writer, sheet_name='Pedidos', index=False)
-        st.session_state.followup_df.to_excel(writer, sheet_name='Follow-ups', index=False)
-        st.session_state.pagamentos_df.to_excel(writer, sheet_name='Pagamentos', index=False)
-        
-        # Criar aba de informações
-        info_df = pd.DataFrame({
-            'Informação': ['Última atualização', 'Total de pedidos', 'Total de follow-ups', 'Total de pagamentos'],
-            'Valor': [
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                len(st.session_state.pedidos_df),
-                len(st.session_state.followup_df),
-                len(st.session_state.pagamentos_df)
-            ]
-        })
-        info_df.to_excel(writer, sheet_name='Info', index=False)
-    
-    output.seek(0)
-    return output.getvalue()
+    return core.save_data_to_excel(
+        core.combine_tiers('pedidos', core.load_cold('pedidos', pasta_arquivo()),
+                           st.session_state.pedidos_df),
+        st.session_state.followup_df,
+        core.combine_tiers('pagamentos', core.load_cold('pagamentos', pasta_arquivo()),
+                           st.session_state.pagamentos_df),
+        st.session_state.conjunto_id
+    )
 
 # Função para carregar dados do Excel
 def load_data_from_excel(excel_file):
     try:
-        # Carregar pedidos
-        try:
-            st.session_state.pedidos_df = pd.read_excel(excel_file, sheet_name='Pedidos')
-        except:
-            st.session_state.pedidos_df = pd.DataFrame(columns=[
-                'Nº Pedido', 'Fornecedor', 'País', 'Produto', 'Valor', 'Condição Pagamento',
-                'Data Pedido', 'Leadtime Prometido', 'Data Prometida', 'Data Real', 'Status',
-                'Pagamento', 'Observações'
-            ])
-        
-        # Carregar follow-ups
-        try:
-            st.session_state.followup_df = pd.read_excel(excel_file, sheet_name='Follow-ups')
-        except:
-            st.session_state.followup_df = pd.DataFrame(columns=[
-                'Data', 'Fornecedor', 'Pedido', 'Meio', 'SLA Resposta'
-            ])
-        
-        # Carregar pagamentos
-        try:
-            st.session_state.pagamentos_df = pd.read_excel(excel_file, sheet_name='Pagamentos')
-        except:
-            st.session_state.pagamentos_df = pd.DataFrame(columns=[
-                'Pedido', 'Fornecedor', 'Valor Total', 'Valor Pago', 'Data Prevista Pagamento', 'Status'
-            ])
-        
-        # Buscar data da última atualização
-        try:
-            info_df = pd.read_excel(excel_file, sheet_name='Info')
-            ultima_atualizacao = info_df[info_df['Informação'] == 'Última atualização']['Valor'].iloc[0]
-        except:
-            ultima_atualizacao = 'Data desconhecida'
-        
-        return True, ultima_atualizacao
+        (st.session_state.pedidos_df,
+         st.session_state.followup_df,
+         st.session_state.pagamentos_df,
+         ultima_atualizacao,
+         st.session_state.conjunto_id) = core.load_data_from_excel(excel_file)
     except Exception as e:
         st.error(f"Erro ao carregar dados: {str(e)}")
         return False, None
 
+    # O backup carregado é a cópia completa do conjunto (inclui os arquivados):
+    # o arquivo anterior é descartado para que linhas removidas não reapareçam
+    try:
+        core.clear_cold(pasta_arquivo())
+    except Exception as e:
+        st.warning(f"Não foi possível limpar o arquivo anterior: {str(e)}")
+    arquivar_fechados()
+    return True, ultima_atualizacao
+
+# Move pedidos e pagamentos encerrados de meses anteriores para o arquivo em disco.
+# Se a gravação falhar, os dados continuam inteiros na sessão (camada quente).
+def arquivar_fechados():
+    try:
+        (pedidos_df,
+         pagamentos_df,
+         n_pedidos,
+         n_pagamentos) = core.archive_closed(
+            st.session_state.pedidos_df,
+            st.session_state.pagamentos_df,
+            pasta_arquivo()
+        )
+    except Exception as e:
+        st.warning(f"⚠️ Não foi possível arquivar os registros encerrados: {str(e)}")
+        return
+
+    st.session_state.pedidos_df = pedidos_df
+    st.session_state.pagamentos_df = pagamentos_df
+    if n_pedidos or n_pagamentos:
+        st.toast(f"🗄️ {n_pedidos} pedidos e {n_pagamentos} pagamentos encerrados foram arquivados")
+
 # Inicialização dos dados de sessão
 def init_session_data():
     if 'pedidos_df' not in st.session_state:
-        st.session_state.pedidos_df = pd.DataFrame(columns=[
-            'Nº Pedido', 'Fornecedor', 'País', 'Produto', 'Valor', 'Condição Pagamento',
-            'Data Pedido', 'Leadtime Prometido', 'Data Prometida', 'Data Real', 'Status',
-            'Pagamento', 'Observações'
-        ])
+        st.session_state.pedidos_df = pd.DataFrame(columns=core.PEDIDOS_COLUMNS)
 
     if 'followup_df' not in st.session_state:
-        st.session_state.followup_df = pd.DataFrame(columns=[
-            'Data', 'Fornecedor', 'Pedido', 'Meio', 'SLA Resposta'
-        ])
+        st.session_state.followup_df = pd.DataFrame(columns=core.FOLLOWUP_COLUMNS)
 
     if 'pagamentos_df' not in st.session_state:
-        st.session_state.pagamentos_df = pd.DataFrame(columns=[
-            'Pedido', 'Fornecedor', 'Valor Total', 'Valor Pago', 'Data Prevista Pagamento', 'Status'
-        ])
+        st.session_state.pagamentos_df = pd.DataFrame(columns=core.PAGAMENTOS_COLUMNS)
+
+    if 'conjunto_id' not in st.session_state:
+        st.session_state.conjunto_id = str(uuid.uuid4())
 
 init_session_data()
 
@@ -178,47 +182,136 @@ TRANSIT_TIMES = {
     'Índia': {'Marítimo': '28-35 dias', 'Aéreo': '6-8 dias'}
 }
 
+# ========== CACHE E MEDIÇÃO DE LATÊNCIA ==========
+# Cálculos memorizados por sessão: só são refeitos quando os dados (ou o dia) mudam.
+# As tabelas da sessão são sempre substituídas, nunca alteradas no lugar, então a
+# identidade do objeto basta como chave; hashear o DataFrame a cada rerun (como faz
+# st.cache_data) custa mais que o próprio cálculo. Uma entrada por cálculo.
+def memo_sessao(nome, func, *args):
+    chave = tuple(id(arg) if isinstance(arg, pd.DataFrame) else arg for arg in args)
+    memo = st.session_state.setdefault('memo', {})
+    if nome in memo and memo[nome][0] == chave:
+        return memo[nome][2]
+    resultado = func(*args)
+    # Guarda os argumentos para que os ids não sejam reutilizados
+    memo[nome] = (chave, args, resultado)
+    return resultado
+
+def cached_kpis(pedidos_df, followup_df, hoje):
+    return memo_sessao('kpis', core.calculate_kpis, pedidos_df, followup_df, hoje)
+
+def cached_atencao_hoje(pedidos_df, hoje):
+    return memo_sessao('atencao_hoje', core.get_atencao_hoje, pedidos_df, hoje)
+
+def cached_payment_totals(pagamentos_df):
+    return memo_sessao('payment_totals', core.calculate_payment_totals, pagamentos_df)
+
+# Leitura do arquivo apenas nas partições pedidas; `versao` (datas de modificação
+# das partições) invalida o cache quando algo novo é arquivado
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_cold(pasta, tabela, inicio, versao):
+    return core.load_cold(tabela, pasta, inicio)
+
+def versao_arquivo(pasta, tabela, inicio):
+    return tuple(
+        (mes, (Path(pasta) / tabela / f"mes={mes}" / 'dados.parquet').stat().st_mtime_ns)
+        for mes in core.list_cold_months(tabela, pasta) if mes >= inicio
+    )
+
+# Seletor do histórico arquivado; devolve o mês inicial escolhido ou None
+def seletor_historico(tabela, key):
+    meses = core.list_cold_months(tabela, pasta_arquivo())
+    if not meses:
+        return None
+    opcoes = ["Somente em aberto"] + meses[::-1]
+    escolha = st.selectbox("🗄️ Incluir histórico arquivado desde:", opcoes, key=key)
+    return None if escolha == "Somente em aberto" else escolha
+
+# Camada quente somada à camada fria a partir de `inicio`, com os mesmos tipos
+def dados_com_historico(tabela, df_quente, inicio):
+    if inicio is None:
+        return df_quente
+    pasta = str(pasta_arquivo())
+    df_frio = cached_cold(pasta, tabela, inicio, versao_arquivo(pasta, tabela, inicio))
+    return core.combine_tiers(tabela, df_frio, df_quente)
+
+# Registra e exibe o tempo de cada execução de um fragmento; a legenda fica
+# dentro do fragmento, então é atualizada também nos reruns parciais.
+# Sem PEDIDOS_DEBUG_LATENCIA=1 a função é devolvida sem alteração.
+def medir_latencia(func):
+    if not DEBUG_LATENCIA:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        inicio = time.perf_counter()
+        resultado = func(*args, **kwargs)
+        duracao = (time.perf_counter() - inicio) * 1000
+        st.session_state.setdefault('latencias', {})[func.__name__] = duracao
+        st.caption(f"⏱️ {duracao:.0f} ms")
+        return resultado
+    return wrapper
+
+# Função para calcular KPIs
+def calculate_kpis(pedidos_df):
+    return cached_kpis(
+        pedidos_df,
+        st.session_state.followup_df,
+        datetime.now().date()
+    )
+
 # ========== SEÇÃO DE BACKUP E RESTAURAÇÃO ==========
-st.sidebar.markdown("---")
-st.sidebar.markdown("### 💾 **Gerenciar Dados**")
+@st.fragment
+@medir_latencia
+def painel_dados():
+    st.markdown("---")
+    st.markdown("### 💾 **Gerenciar Dados**")
+
+    # Status dos dados
+    st.markdown(f"""
+    <div class="data-status">
+    📦 {len(st.session_state.pedidos_df)} pedidos<br>
+    📞 {len(st.session_state.followup_df)} follow-ups<br>
+    💰 {len(st.session_state.pagamentos_df)} pagamentos
+    </div>
+    """, unsafe_allow_html=True)
+
+    # Upload de dados
+    st.markdown("#### 📁 **Carregar Dados Salvos**")
+    uploaded_file = st.file_uploader("Selecione seu arquivo de backup:", type=['xlsx', 'xls'], key="data_upload")
+
+    # Carrega cada arquivo uma única vez; o uploader mantém o arquivo entre reruns
+    if uploaded_file is not None and st.session_state.get('ultimo_upload') != uploaded_file.file_id:
+        success, ultima_atualizacao = load_data_from_excel(uploaded_file)
+        if success:
+            st.session_state.ultimo_upload = uploaded_file.file_id
+            st.session_state.ultima_atualizacao = ultima_atualizacao
+            st.rerun()
+
+    if st.session_state.get('ultimo_upload') is not None and uploaded_file is not None:
+        st.success(f"✅ Dados carregados!\nÚltima atualização: {st.session_state.ultima_atualizacao}")
+
+    # Download de dados
+    st.markdown("#### 💾 **Salvar Dados**")
+    if st.button("📥 Baixar Backup Completo"):
+        excel_data = save_data_to_excel()
+        filename = f"pedidos_backup_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+
+        st.download_button(
+            label="⬇️ Download Excel",
+            data=excel_data,
+            file_name=filename,
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        st.success("✅ Clique no botão acima para baixar!")
+
+with st.sidebar:
+    painel_dados()
 
-# Status dos dados
 total_pedidos = len(st.session_state.pedidos_df)
 total_followups = len(st.session_state.followup_df)
 total_pagamentos = len(st.session_state.pagamentos_df)
 
-st.sidebar.markdown(f"""
-<div class="data-status">
-📦 {total_pedidos} pedidos<br>
-📞 {total_followups} follow-ups<br>
-💰 {total_pagamentos} pagamentos
-</div>
-""", unsafe_allow_html=True)
-
-# Upload de dados
-st.sidebar.markdown("#### 📁 **Carregar Dados Salvos**")
-uploaded_file = st.sidebar.file_uploader("Selecione seu arquivo de backup:", type=['xlsx', 'xls'], key="data_upload")
-
-if uploaded_file is not None:
-    success, ultima_atualizacao = load_data_from_excel(uploaded_file)
-    if success:
-        st.sidebar.success(f"✅ Dados carregados!\nÚltima atualização: {ultima_atualizacao}")
-        st.experimental_rerun()
-
-# Download de dados
-st.sidebar.markdown("#### 💾 **Salvar Dados**")
-if st.sidebar.button("📥 Baixar Backup Completo"):
-    excel_data = save_data_to_excel()
-    filename = f"pedidos_backup_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
-    
-    st.sidebar.download_button(
-        label="⬇️ Download Excel",
-        data=excel_data,
-        file_name=filename,
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-    st.sidebar.success("✅ Clique no botão acima para baixar!")
-
 # Sidebar para navegação
 st.sidebar.markdown("---")
 st.sidebar.title("📦 Navegação")
@@ -243,6 +336,7 @@ with st.sidebar.expander("❓ Como Usar"):
     
     **💡 Dicas:**
     - Dados salvos apenas na sessão
+    - Pedidos encerrados são arquivados, mas continuam no backup Excel
     - Sempre faça backup!
     - Arquivos em formato Excel (.xlsx)
     """)
@@ -258,53 +352,28 @@ def get_greeting():
     else:
         return "🌙 Boa noite, Henri!"
 
-# Função para calcular KPIs
-def calculate_kpis():
-    if st.session_state.pedidos_df.empty:
-        return {'no_prazo': 0, 'atrasados': 0, 'pag_pendente': 0, 'sla_medio': 0}
-    
-    df = st.session_state.pedidos_df.copy()
-    hoje = datetime.now().date()
-    
-    # Converter datas
-    if 'Data Prometida' in df.columns and not df.empty:
-        df['Data Prometida'] = pd.to_datetime(df['Data Prometida'], errors='coerce').dt.date
-        df['Data Real'] = pd.to_datetime(df['Data Real'], errors='coerce').dt.date
-    
-    no_prazo = len(df[df['Status'] == 'Entregue'])
-    atrasados = len(df[(df['Data Prometida'] < hoje) & (df['Status'] != 'Entregue')])
-    pag_pendente = len(df[df['Pagamento'].isin(['Não', 'Adiantamento'])])
-    
-    # SLA médio
-    if not st.session_state.followup_df.empty:
-        sla_medio = st.session_state.followup_df['SLA Resposta'].mean()
-    else:
-        sla_medio = 0
-    
-    return {
-        'no_prazo': no_prazo,
-        'atrasados': atrasados, 
-        'pag_pendente': pag_pendente,
-        'sla_medio': round(sla_medio, 1)
-    }
+# ========== BLOCOS DO COCKPIT ==========
+# Montar as figuras do plotly custa mais que os cálculos; elas também são memorizadas
+def figura_kanban(df):
+    kanban_data = df['Status'].value_counts()
+    fig = px.pie(values=kanban_data.values, names=kanban_data.index, 
+                color_discrete_sequence=['#28a745', '#ffc107', '#dc3545', '#007bff'])
+    fig.update_layout(height=300, showlegend=True)
+    return fig
 
-# ABA 1: COCKPIT DIÁRIO
-if page == "🏠 Cockpit Diário":
-    st.markdown(f'<h1 class="main-header">{get_greeting()}</h1>', unsafe_allow_html=True)
-    
-    # Aviso sobre dados
-    if total_pedidos == 0 and total_followups == 0 and total_pagamentos == 0:
-        st.markdown('''
-        <div class="backup-section">
-            <h4>🚀 Primeiros Passos:</h4>
-            <p><strong>1.</strong> Carregue um backup existente (sidebar) OU</p>
-            <p><strong>2.</strong> Comece adicionando pedidos na aba "Controle de Pedidos"</p>
-            <p><strong>💡 Lembre-se:</strong> Sempre baixe seu backup Excel no fim do dia!</p>
-        </div>
-        ''', unsafe_allow_html=True)
-    
-    # KPIs
-    kpis = calculate_kpis()
+def figura_leadtime(df):
+    country_data = df.groupby('País')['Leadtime Prometido'].mean()
+    if country_data.empty:
+        return None
+    fig = px.bar(x=country_data.index, y=country_data.values,
+               color_discrete_sequence=['#007bff'])
+    fig.update_layout(height=300, xaxis_title="País", yaxis_title="Lead Time (dias)")
+    return fig
+
+def cockpit_kpis(pedidos_df, entregues_arquivados=0):
+    kpis = calculate_kpis(pedidos_df)
+    # Todo pedido arquivado foi entregue: soma os que não estão no período carregado
+    kpis = {**kpis, 'no_prazo': kpis['no_prazo'] + entregues_arquivados}
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -339,43 +408,31 @@ if page == "🏠 Cockpit Diário":
             <p class="kpi-label">SLA Médio (dias)</p>
         </div>
         ''', unsafe_allow_html=True)
-    
-    st.markdown("---")
-    
-    # Gráficos
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📊 Kanban Visual")
-        if not st.session_state.pedidos_df.empty:
-            df = st.session_state.pedidos_df
-            kanban_data = df['Status'].value_counts()
-            fig = px.pie(values=kanban_data.values, names=kanban_data.index, 
-                        color_discrete_sequence=['#28a745', '#ffc107', '#dc3545', '#007bff'])
-            fig.update_layout(height=300, showlegend=True)
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("Adicione pedidos para visualizar o kanban")
-    
-    with col2:
-        st.subheader("🌍 Lead Time por País")
-        if not st.session_state.pedidos_df.empty:
-            df = st.session_state.pedidos_df
-            if 'País' in df.columns and 'Leadtime Prometido' in df.columns:
-                country_data = df.groupby('País')['Leadtime Prometido'].mean()
-                if not country_data.empty:
-                    fig = px.bar(x=country_data.index, y=country_data.values,
-                               color_discrete_sequence=['#007bff'])
-                    fig.update_layout(height=300, xaxis_title="País", yaxis_title="Lead Time (dias)")
-                    st.plotly_chart(fig, use_container_width=True)
-                else:
-                    st.info("Dados insuficientes para gráfico")
+
+def cockpit_kanban(pedidos_df):
+    st.subheader("📊 Kanban Visual")
+    if not pedidos_df.empty:
+        fig = memo_sessao('fig_kanban', figura_kanban, pedidos_df)
+        st.plotly_chart(fig, use_container_width=True)
+    else:
+        st.info("Adicione pedidos para visualizar o kanban")
+
+def cockpit_leadtime(pedidos_df):
+    st.subheader("🌍 Lead Time por País")
+    if not pedidos_df.empty:
+        df = pedidos_df
+        if 'País' in df.columns and 'Leadtime Prometido' in df.columns:
+            fig = memo_sessao('fig_leadtime', figura_leadtime, df)
+            if fig is not None:
+                st.plotly_chart(fig, use_container_width=True)
             else:
-                st.info("Dados insuficientes")
+                st.info("Dados insuficientes para gráfico")
         else:
-            st.info("Adicione pedidos para visualizar lead times")
-    
-    # Atenção Hoje
+            st.info("Dados insuficientes")
+    else:
+        st.info("Adicione pedidos para visualizar lead times")
+
+def cockpit_atencao():
     st.markdown('''
     <div class="attention-box">
         <h3>⚠️ Atenção Hoje</h3>
@@ -384,284 +441,260 @@ if page == "🏠 Cockpit Diário":
     ''', unsafe_allow_html=True)
     
     if not st.session_state.pedidos_df.empty:
-        hoje = datetime.now().date()
-        df = st.session_state.pedidos_df.copy()
-        if 'Data Prometida' in df.columns:
-            df['Data Prometida'] = pd.to_datetime(df['Data Prometida'], errors='coerce').dt.date
-            atencao_hoje = df[
-                (df['Data Prometida'] <= hoje + timedelta(days=2)) & 
-                (df['Status'] != 'Entregue')
-            ]
+        if 'Data Prometida' in st.session_state.pedidos_df.columns:
+            atencao_hoje = cached_atencao_hoje(st.session_state.pedidos_df, datetime.now().date())
             if not atencao_hoje.empty:
-                st.dataframe(atencao_hoje[['Nº Pedido', 'Fornecedor', 'Data Prometida', 'Status']], 
-                           use_container_width=True)
+                st.dataframe(atencao_hoje, use_container_width=True)
             else:
                 st.success("✅ Nenhum pedido exige atenção especial hoje!")
     else:
         st.info("Nenhum pedido cadastrado ainda.")
 
-# ABA 2: CONTROLE DE PEDIDOS
-elif page == "📋 Controle de Pedidos":
-    st.header("📋 Controle de Pedidos")
-    
-    # Formulário para adicionar pedidos
-    with st.expander("➕ Adicionar Novo Pedido", expanded=False):
-        with st.form("novo_pedido"):
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                num_pedido = st.text_input("Nº Pedido")
-                fornecedor = st.text_input("Fornecedor")
-                pais = st.selectbox("País", ["China", "EUA", "México", "Inglaterra", "Índia"])
-            
-            with col2:
-                produto = st.text_input("Produto")
-                valor = st.number_input("Valor", min_value=0.0, step=0.01)
-                condicao_pag = st.selectbox("Condição Pagamento", 
-                                          ["À vista", "30 dias", "60 dias", "90 dias"])
-            
-            with col3:
-                data_pedido = st.date_input("Data Pedido")
-                leadtime_prometido = st.number_input("Lead Time Prometido (dias)", min_value=1)
-                data_prometida = st.date_input("Data Prometida")
-            
-            col4, col5 = st.columns(2)
-            with col4:
-                data_real = st.date_input("Data Real (opcional)", value=None)
-                status = st.selectbox("Status", ["Pendente", "Em Produção", "Despachado", "Entregue"])
-            
-            with col5:
-                pagamento = st.selectbox("Pagamento", ["Não", "Sim", "Adiantamento"])
-                observacoes = st.text_area("Observações")
-            
-            if st.form_submit_button("💾 Salvar Pedido"):
-                if num_pedido and fornecedor:
-                    novo_pedido = {
-                        'Nº Pedido': num_pedido,
-                        'Fornecedor': fornecedor,
-                        'País': pais,
-                        'Produto': produto,
-                        'Valor': valor,
-                        'Condição Pagamento': condicao_pag,
-                        'Data Pedido': data_pedido,
-                        'Leadtime Prometido': leadtime_prometido,
-                        'Data Prometida': data_prometida,
-                        'Data Real': data_real,
-                        'Status': status,
-                        'Pagamento': pagamento,
-                        'Observações': observacoes
-                    }
-                    st.session_state.pedidos_df = pd.concat([
-                        st.session_state.pedidos_df, 
-                        pd.DataFrame([novo_pedido])
-                    ], ignore_index=True)
-                    st.success("✅ Pedido adicionado! Lembre-se de fazer backup depois.")
-                    st.experimental_rerun()
-                else:
-                    st.error("❌ Preencha pelo menos Nº Pedido e Fornecedor")
-    
-    # Exibir tabela de pedidos
-    if not st.session_state.pedidos_df.empty:
-        st.subheader("📊 Lista de Pedidos")
-        
-        # Filtros
+# ========== BLOCOS DE PEDIDOS ==========
+@st.fragment
+@medir_latencia
+def form_novo_pedido():
+    with st.form("novo_pedido"):
         col1, col2, col3 = st.columns(3)
+        
         with col1:
-            fornecedores = ["Todos"] + list(st.session_state.pedidos_df['Fornecedor'].unique())
-            filtro_fornecedor = st.selectbox("Filtrar por Fornecedor", fornecedores)
+            num_pedido = st.text_input("Nº Pedido")
+            fornecedor = st.text_input("Fornecedor")
+            pais = st.selectbox("País", ["China", "EUA", "México", "Inglaterra", "Índia"])
+        
         with col2:
-            status_list = ["Todos"] + list(st.session_state.pedidos_df['Status'].unique())
-            filtro_status = st.selectbox("Filtrar por Status", status_list)
-        with col3:
-            paises = ["Todos"] + list(st.session_state.pedidos_df['País'].unique())
-            filtro_pais = st.selectbox("Filtrar por País", paises)
+            produto = st.text_input("Produto")
+            valor = st.number_input("Valor", min_value=0.0, step=0.01)
+            condicao_pag = st.selectbox("Condição Pagamento", 
+                                      ["À vista", "30 dias", "60 dias", "90 dias"])
         
-        # Aplicar filtros
-        df_filtrado = st.session_state.pedidos_df.copy()
-        if filtro_fornecedor != "Todos":
-            df_filtrado = df_filtrado[df_filtrado['Fornecedor'] == filtro_fornecedor]
-        if filtro_status != "Todos":
-            df_filtrado = df_filtrado[df_filtrado['Status'] == filtro_status]
-        if filtro_pais != "Todos":
-            df_filtrado = df_filtrado[df_filtrado['País'] == filtro_pais]
+        with col3:
+            data_pedido = st.date_input("Data Pedido")
+            leadtime_prometido = st.number_input("Lead Time Prometido (dias)", min_value=1)
+            data_prometida = st.date_input("Data Prometida")
         
-        st.dataframe(df_filtrado, use_container_width=True)
+        col4, col5 = st.columns(2)
+        with col4:
+            data_real = st.date_input("Data Real (opcional)", value=None)
+            status = st.selectbox("Status", ["Pendente", "Em Produção", "Despachado", "Entregue"])
         
-        # Botões de ação
-        col1, col2 = st.columns(2)
-        with col1:
-            if st.button("📥 Exportar para CSV"):
-                csv = df_filtrado.to_csv(index=False)
-                st.download_button(
-                    "⬇️ Download CSV",
-                    csv,
-                    f"pedidos_{datetime.now().strftime('%Y%m%d')}.csv",
-                    "text/csv"
-                )
+        with col5:
+            pagamento = st.selectbox("Pagamento", ["Não", "Sim", "Adiantamento"])
+            observacoes = st.text_area("Observações")
         
-        with col2:
-            if st.button("🗑️ Limpar Todos os Pedidos"):
-                st.session_state.pedidos_df = pd.DataFrame(columns=[
-                    'Nº Pedido', 'Fornecedor', 'País', 'Produto', 'Valor', 'Condição Pagamento',
-                    'Data Pedido', 'Leadtime Prometido', 'Data Prometida', 'Data Real', 'Status',
-                    'Pagamento', 'Observações'
-                ])
-                st.success("✅ Pedidos limpos!")
-                st.experimental_rerun()
-    else:
-        st.info("Nenhum pedido cadastrado. Use o formulário acima para adicionar.")
+        if st.form_submit_button("💾 Salvar Pedido"):
+            if num_pedido and fornecedor:
+                novo_pedido = {
+                    'Nº Pedido': num_pedido,
+                    'Fornecedor': fornecedor,
+                    'País': pais,
+                    'Produto': produto,
+                    'Valor': valor,
+                    'Condição Pagamento': condicao_pag,
+                    'Data Pedido': data_pedido,
+                    'Leadtime Prometido': leadtime_prometido,
+                    'Data Prometida': data_prometida,
+                    'Data Real': data_real,
+                    'Status': status,
+                    'Pagamento': pagamento,
+                    'Observações': observacoes,
+                    'ID Pedido': core.new_row_id()
+                }
+                st.session_state.pedidos_df = pd.concat([
+                    st.session_state.pedidos_df, 
+                    pd.DataFrame([novo_pedido])
+                ], ignore_index=True)
+                arquivar_fechados()
+                st.toast("✅ Pedido adicionado! Lembre-se de fazer backup depois.")
+                # Um único rerun completo atualiza tabela e contadores
+                st.rerun()
+            else:
+                st.error("❌ Preencha pelo menos Nº Pedido e Fornecedor")
 
-# ABA 3: FOLLOW UP TRACKER
-elif page == "📞 Follow Up Tracker":
-    st.header("📞 Follow Up Tracker")
+@st.fragment
+@medir_latencia
+def tabela_pedidos():
+    st.subheader("📊 Lista de Pedidos")
     
-    # Formulário para adicionar follow-up
-    with st.expander("➕ Registrar Follow-Up", expanded=False):
-        with st.form("novo_followup"):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                data_followup = st.date_input("Data")
-                fornecedor_fu = st.text_input("Fornecedor")
-                pedido_fu = st.text_input("Pedido")
-            
-            with col2:
-                meio = st.selectbox("Meio", ["E-mail", "WhatsApp", "Telefone", "Presencial"])
-                sla_resposta = st.number_input("SLA Resposta (dias)", min_value=0, max_value=30)
-            
-            if st.form_submit_button("💾 Registrar Follow-Up"):
-                if fornecedor_fu:
-                    novo_followup = {
-                        'Data': data_followup,
-                        'Fornecedor': fornecedor_fu,
-                        'Pedido': pedido_fu,
-                        'Meio': meio,
-                        'SLA Resposta': sla_resposta
-                    }
-                    st.session_state.followup_df = pd.concat([
-                        st.session_state.followup_df,
-                        pd.DataFrame([novo_followup])
-                    ], ignore_index=True)
-                    st.success("✅ Follow-up registrado!")
-                    st.experimental_rerun()
-                else:
-                    st.error("❌ Preencha pelo menos o Fornecedor")
+    # Filtros
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        fornecedores = ["Todos"] + list(st.session_state.pedidos_df['Fornecedor'].unique())
+        filtro_fornecedor = st.selectbox("Filtrar por Fornecedor", fornecedores)
+    with col2:
+        status_list = ["Todos"] + list(st.session_state.pedidos_df['Status'].unique())
+        filtro_status = st.selectbox("Filtrar por Status", status_list)
+    with col3:
+        paises = ["Todos"] + list(st.session_state.pedidos_df['País'].unique())
+        filtro_pais = st.selectbox("Filtrar por País", paises)
     
-    # Exibir tabela e estatísticas
-    if not st.session_state.followup_df.empty:
-        col1, col2 = st.columns([2, 1])
+    # Aplicar filtros
+    df_filtrado = st.session_state.pedidos_df.copy()
+    if filtro_fornecedor != "Todos":
+        df_filtrado = df_filtrado[df_filtrado['Fornecedor'] == filtro_fornecedor]
+    if filtro_status != "Todos":
+        df_filtrado = df_filtrado[df_filtrado['Status'] == filtro_status]
+    if filtro_pais != "Todos":
+        df_filtrado = df_filtrado[df_filtrado['País'] == filtro_pais]
+    
+    st.dataframe(df_filtrado, use_container_width=True)
+    
+    # Botões de ação
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("📥 Exportar para CSV"):
+            csv = df_filtrado.to_csv(index=False)
+            st.download_button(
+                "⬇️ Download CSV",
+                csv,
+                f"pedidos_{datetime.now().strftime('%Y%m%d')}.csv",
+                "text/csv"
+            )
+    
+    with col2:
+        if st.button("🗑️ Limpar Todos os Pedidos"):
+            st.session_state.pedidos_df = pd.DataFrame(columns=core.PEDIDOS_COLUMNS)
+            core.clear_cold(pasta_arquivo(), 'pedidos')
+            st.toast("✅ Pedidos limpos!")
+            st.rerun()
+
+# ========== BLOCOS DE FOLLOW-UP ==========
+@st.fragment
+@medir_latencia
+def form_novo_followup():
+    with st.form("novo_followup"):
+        col1, col2 = st.columns(2)
         
         with col1:
-            st.subheader("📊 Histórico de Follow-Ups")
-            st.dataframe(st.session_state.followup_df, use_container_width=True)
+            data_followup = st.date_input("Data")
+            fornecedor_fu = st.text_input("Fornecedor")
+            pedido_fu = st.text_input("Pedido")
         
         with col2:
-            st.subheader("📈 SLA Médio por Fornecedor")
-            if 'SLA Resposta' in st.session_state.followup_df.columns:
-                sla_medio = st.session_state.followup_df.groupby('Fornecedor')['SLA Resposta'].mean()
-                for fornecedor, sla in sla_medio.items():
-                    st.metric(fornecedor, f"{sla:.1f} dias")
-    else:
-        st.info("Nenhum follow-up registrado ainda.")
+            meio = st.selectbox("Meio", ["E-mail", "WhatsApp", "Telefone", "Presencial"])
+            sla_resposta = st.number_input("SLA Resposta (dias)", min_value=0, max_value=30)
+        
+        if st.form_submit_button("💾 Registrar Follow-Up"):
+            if fornecedor_fu:
+                novo_followup = {
+                    'Data': data_followup,
+                    'Fornecedor': fornecedor_fu,
+                    'Pedido': pedido_fu,
+                    'Meio': meio,
+                    'SLA Resposta': sla_resposta
+                }
+                st.session_state.followup_df = pd.concat([
+                    st.session_state.followup_df,
+                    pd.DataFrame([novo_followup])
+                ], ignore_index=True)
+                st.toast("✅ Follow-up registrado!")
+                st.rerun()
+            else:
+                st.error("❌ Preencha pelo menos o Fornecedor")
 
-# ABA 4: CONTROLE DE PAGAMENTOS
-elif page == "💰 Controle de Pagamentos":
-    st.header("💰 Controle de Pagamentos")
+def tabela_followups():
+    col1, col2 = st.columns([2, 1])
     
-    # Formulário para adicionar pagamento
-    with st.expander("➕ Registrar Pagamento", expanded=False):
-        with st.form("novo_pagamento"):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                pedido_pag = st.text_input("Pedido")
-                fornecedor_pag = st.text_input("Fornecedor")
-                valor_total = st.number_input("Valor Total", min_value=0.0, step=0.01)
-            
-            with col2:
-                valor_pago = st.number_input("Valor Pago", min_value=0.0, step=0.01)
-                data_prevista = st.date_input("Data Prevista Pagamento")
-                status_pag = st.selectbox("Status", ["Pendente", "Pago Parcial", "Pago"])
-            
-            if st.form_submit_button("💾 Registrar Pagamento"):
-                if pedido_pag and fornecedor_pag:
-                    perc_pago = (valor_pago / valor_total * 100) if valor_total > 0 else 0
-                    novo_pagamento = {
-                        'Pedido': pedido_pag,
-                        'Fornecedor': fornecedor_pag,
-                        'Valor Total': valor_total,
-                        'Valor Pago': valor_pago,
-                        '% Pago': round(perc_pago, 2),
-                        'Data Prevista Pagamento': data_prevista,
-                        'Status': status_pag
-                    }
-                    st.session_state.pagamentos_df = pd.concat([
-                        st.session_state.pagamentos_df,
-                        pd.DataFrame([novo_pagamento])
-                    ], ignore_index=True)
-                    st.success("✅ Pagamento registrado!")
-                    st.experimental_rerun()
-                else:
-                    st.error("❌ Preencha pelo menos Pedido e Fornecedor")
+    with col1:
+        st.subheader("📊 Histórico de Follow-Ups")
+        st.dataframe(st.session_state.followup_df, use_container_width=True)
     
-    # Exibir informações de pagamentos
-    if not st.session_state.pagamentos_df.empty:
-        # Métricas de exposição financeira
-        df_pag = st.session_state.pagamentos_df
-        total_adiantado = df_pag[df_pag['Status'].isin(['Pago Parcial', 'Pago'])]['Valor Pago'].sum()
-        total_pendente = df_pag[df_pag['Status'] == 'Pendente']['Valor Total'].sum()
+    with col2:
+        st.subheader("📈 SLA Médio por Fornecedor")
+        if 'SLA Resposta' in st.session_state.followup_df.columns:
+            sla_medio = st.session_state.followup_df.groupby('Fornecedor')['SLA Resposta'].mean()
+            for fornecedor, sla in sla_medio.items():
+                st.metric(fornecedor, f"{sla:.1f} dias")
+
+# ========== BLOCOS DE PAGAMENTOS ==========
+@st.fragment
+@medir_latencia
+def form_novo_pagamento():
+    with st.form("novo_pagamento"):
+        col1, col2 = st.columns(2)
         
-        col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("💰 Total Adiantado", f"R$ {total_adiantado:,.2f}")
+            pedido_pag = st.text_input("Pedido")
+            fornecedor_pag = st.text_input("Fornecedor")
+            valor_total = st.number_input("Valor Total", min_value=0.0, step=0.01)
+        
         with col2:
-            st.metric("⏳ Total Pendente", f"R$ {total_pendente:,.2f}")
-        with col3:
-            st.metric("📊 Exposição Financeira", f"R$ {total_adiantado:,.2f}")
+            valor_pago = st.number_input("Valor Pago", min_value=0.0, step=0.01)
+            data_prevista = st.date_input("Data Prevista Pagamento")
+            status_pag = st.selectbox("Status", ["Pendente", "Pago Parcial", "Pago"])
         
-        st.subheader("📊 Lista de Pagamentos")
-        st.dataframe(df_pag, use_container_width=True)
-    else:
-        st.info("Nenhum pagamento registrado ainda.")
+        if st.form_submit_button("💾 Registrar Pagamento"):
+            if pedido_pag and fornecedor_pag:
+                perc_pago = (valor_pago / valor_total * 100) if valor_total > 0 else 0
+                novo_pagamento = {
+                    'Pedido': pedido_pag,
+                    'Fornecedor': fornecedor_pag,
+                    'Valor Total': valor_total,
+                    'Valor Pago': valor_pago,
+                    '% Pago': round(perc_pago, 2),
+                    'Data Prevista Pagamento': data_prevista,
+                    'Status': status_pag,
+                    'ID Pagamento': core.new_row_id()
+                }
+                st.session_state.pagamentos_df = pd.concat([
+                    st.session_state.pagamentos_df,
+                    pd.DataFrame([novo_pagamento])
+                ], ignore_index=True)
+                arquivar_fechados()
+                st.toast("✅ Pagamento registrado!")
+                st.rerun()
+            else:
+                st.error("❌ Preencha pelo menos Pedido e Fornecedor")
 
-# ABA 5: CALCULADORA TRANSIT TIME
-elif page == "🚢 Calculadora Transit Time":
-    st.header("🚢 Calculadora de Transit Time")
-    
-    col1, col2 = st.columns([1, 1])
+def tabela_pagamentos(df_pag):
+    # Métricas de exposição financeira
+    totais = cached_payment_totals(df_pag)
+    total_adiantado = totais['total_adiantado']
+    total_pendente = totais['total_pendente']
     
+    col1, col2, col3 = st.columns(3)
     with col1:
-        st.subheader("🌍 Consultar Prazo")
-        
-        pais_selecionado = st.selectbox("País de Origem:", list(TRANSIT_TIMES.keys()))
-        modal_selecionado = st.selectbox("Modal de Transporte:", ["Marítimo", "Aéreo"])
-        porto_destino = st.selectbox("Porto de Destino:", ["Santos", "Itapoá"])
-        
-        if st.button("🔍 Consultar Prazo"):
-            prazo = TRANSIT_TIMES[pais_selecionado][modal_selecionado]
-            st.success(f"📅 **Transit Time**: {prazo}")
-            st.info(f"🚢 **Rota**: {pais_selecionado} → {porto_destino} ({modal_selecionado})")
-    
+        st.metric("💰 Total Adiantado", f"R$ {total_adiantado:,.2f}")
     with col2:
-        st.subheader("📊 Tabela de Prazos")
-        
-        # Criar tabela formatada dos prazos
-        tabela_prazos = []
-        for pais, modais in TRANSIT_TIMES.items():
-            for modal, prazo in modais.items():
-                tabela_prazos.append({
-                    'País': pais,
-                    'Modal': modal,
-                    'Prazo': prazo
-                })
-        
-        df_prazos = pd.DataFrame(tabela_prazos)
-        st.dataframe(df_prazos, use_container_width=True)
-
-# ABA 6: CONVERSOR DE MEDIDAS
-elif page == "📏 Conversor de Medidas":
-    st.header("📏 Conversor de Medidas")
+        st.metric("⏳ Total Pendente", f"R$ {total_pendente:,.2f}")
+    with col3:
+        st.metric("📊 Exposição Financeira", f"R$ {total_adiantado:,.2f}")
     
+    st.subheader("📊 Lista de Pagamentos")
+    st.dataframe(df_pag, use_container_width=True)
+
+# ========== BLOCOS DE TRANSIT TIME ==========
+@st.fragment
+@medir_latencia
+def consulta_transit_time():
+    st.subheader("🌍 Consultar Prazo")
+    
+    pais_selecionado = st.selectbox("País de Origem:", list(TRANSIT_TIMES.keys()))
+    modal_selecionado = st.selectbox("Modal de Transporte:", ["Marítimo", "Aéreo"])
+    porto_destino = st.selectbox("Porto de Destino:", ["Santos", "Itapoá"])
+    
+    if st.button("🔍 Consultar Prazo"):
+        prazo = TRANSIT_TIMES[pais_selecionado][modal_selecionado]
+        st.success(f"📅 **Transit Time**: {prazo}")
+        st.info(f"🚢 **Rota**: {pais_selecionado} → {porto_destino} ({modal_selecionado})")
+
+# Tabela formatada dos prazos (estática)
+@st.cache_data(show_spinner=False)
+def tabela_prazos_df():
+    tabela_prazos = []
+    for pais, modais in TRANSIT_TIMES.items():
+        for modal, prazo in modais.items():
+            tabela_prazos.append({
+                'País': pais,
+                'Modal': modal,
+                'Prazo': prazo
+            })
+    return pd.DataFrame(tabela_prazos)
+
+# ========== BLOCOS DO CONVERSOR ==========
+@st.fragment
+@medir_latencia
+def conversor_metros():
     col1, col2 = st.columns(2)
     
     with col1:
@@ -677,10 +710,10 @@ elif page == "📏 Conversor de Medidas":
         if metros_para_pol > 0:
             polegadas = metros_para_pol * 39.3701
             st.success(f"📏 **{metros_para_pol} m** = **{polegadas:.2f} in**")
-    
-    st.markdown("---")
-    
-    # Calculadora adicional
+
+@st.fragment
+@medir_latencia
+def calculadora_rapida():
     st.subheader("🧮 Calculadora Rápida")
     col3, col4 = st.columns(2)
     
@@ -698,6 +731,112 @@ elif page == "📏 Conversor de Medidas":
             metros = pol_para_metros / 39.3701
             st.info(f"📏 **{pol_para_metros} in** = **{metros:.2f} m**")
 
+# ABA 1: COCKPIT DIÁRIO
+if page == "🏠 Cockpit Diário":
+    st.markdown(f'<h1 class="main-header">{get_greeting()}</h1>', unsafe_allow_html=True)
+    
+    # Aviso sobre dados
+    if total_pedidos == 0 and total_followups == 0 and total_pagamentos == 0 \
+            and not core.list_cold_months('pedidos', pasta_arquivo()):
+        st.markdown('''
+        <div class="backup-section">
+            <h4>🚀 Primeiros Passos:</h4>
+            <p><strong>1.</strong> Carregue um backup existente (sidebar) OU</p>
+            <p><strong>2.</strong> Comece adicionando pedidos na aba "Controle de Pedidos"</p>
+            <p><strong>💡 Lembre-se:</strong> Sempre baixe seu backup Excel no fim do dia!</p>
+        </div>
+        ''', unsafe_allow_html=True)
+    
+    # Histórico arquivado (lido apenas a partir do mês escolhido)
+    inicio_historico = seletor_historico('pedidos', key="historico_cockpit")
+    pedidos_cockpit = dados_com_historico('pedidos', st.session_state.pedidos_df, inicio_historico)
+    
+    # KPIs (entregues arquivados fora do período contam pelos metadados do Parquet)
+    entregues_arquivados = core.count_cold('pedidos', pasta_arquivo(), antes_de=inicio_historico)
+    cockpit_kpis(pedidos_cockpit, entregues_arquivados)
+    
+    st.markdown("---")
+    
+    # Gráficos
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        cockpit_kanban(pedidos_cockpit)
+    
+    with col2:
+        cockpit_leadtime(pedidos_cockpit)
+    
+    # Atenção Hoje
+    cockpit_atencao()
+
+# ABA 2: CONTROLE DE PEDIDOS
+elif page == "📋 Controle de Pedidos":
+    st.header("📋 Controle de Pedidos")
+    
+    # Formulário para adicionar pedidos
+    with st.expander("➕ Adicionar Novo Pedido", expanded=False):
+        form_novo_pedido()
+    
+    # Exibir tabela de pedidos
+    if not st.session_state.pedidos_df.empty:
+        tabela_pedidos()
+    else:
+        st.info("Nenhum pedido cadastrado. Use o formulário acima para adicionar.")
+
+# ABA 3: FOLLOW UP TRACKER
+elif page == "📞 Follow Up Tracker":
+    st.header("📞 Follow Up Tracker")
+    
+    # Formulário para adicionar follow-up
+    with st.expander("➕ Registrar Follow-Up", expanded=False):
+        form_novo_followup()
+    
+    # Exibir tabela e estatísticas
+    if not st.session_state.followup_df.empty:
+        tabela_followups()
+    else:
+        st.info("Nenhum follow-up registrado ainda.")
+
+# ABA 4: CONTROLE DE PAGAMENTOS
+elif page == "💰 Controle de Pagamentos":
+    st.header("💰 Controle de Pagamentos")
+    
+    # Formulário para adicionar pagamento
+    with st.expander("➕ Registrar Pagamento", expanded=False):
+        form_novo_pagamento()
+    
+    # Exibir informações de pagamentos
+    inicio_historico = seletor_historico('pagamentos', key="historico_pagamentos")
+    df_pag = dados_com_historico('pagamentos', st.session_state.pagamentos_df, inicio_historico)
+    if not df_pag.empty:
+        tabela_pagamentos(df_pag)
+    else:
+        st.info("Nenhum pagamento registrado ainda.")
+
+# ABA 5: CALCULADORA TRANSIT TIME
+elif page == "🚢 Calculadora Transit Time":
+    st.header("🚢 Calculadora de Transit Time")
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        consulta_transit_time()
+    
+    with col2:
+        st.subheader("📊 Tabela de Prazos")
+        st.dataframe(tabela_prazos_df(), use_container_width=True)
+
+# ABA 6: CONVERSOR DE MEDIDAS
+elif page == "📏 Conversor de Medidas":
+    st.header("📏 Conversor de Medidas")
+    
+    conversor_metros()
+    
+    st.markdown("---")
+    
+    # Calculadora adicional
+    calculadora_rapida()
+
 # Instruções de Backup no final da página
 if page != "🏠 Cockpit Diário":
     st.markdown("---")
@@ -709,12 +848,29 @@ if page != "🏠 Cockpit Diário":
     </div>
     ''', unsafe_allow_html=True)
 
+# Latência da execução completa e da última execução de cada fragmento (diagnóstico)
+rodape_latencia = ""
+if DEBUG_LATENCIA:
+    latencia_app = (time.perf_counter() - inicio_execucao) * 1000
+    st.session_state.setdefault('latencias', {})['app'] = latencia_app
+    rodape_latencia = f" | ⏱️ {latencia_app:.0f} ms"
+
+    with st.sidebar.expander("⏱️ Latência dos Reruns"):
+        st.dataframe(
+            pd.DataFrame({
+                'Bloco': list(st.session_state.latencias.keys()),
+                'ms': [round(ms, 1) for ms in st.session_state.latencias.values()]
+            }),
+            hide_index=True,
+            use_container_width=True
+        )
+
 # Footer
 st.markdown("---")
 st.markdown(
     f"""
     <div style='text-align: center; color: #6c757d; font-size: 0.9rem;'>
-        📦 Suíte de Controle de Pedidos | Dados: {total_pedidos} pedidos, {total_followups} follow-ups, {total_pagamentos} pagamentos
+        📦 Suíte de Controle de Pedidos | Dados: {total_pedidos} pedidos, {total_followups} follow-ups, {total_pagamentos} pagamentos{rodape_latencia}
     </div>
     """, 
     unsafe_allow_html=True
@@ -0,0 +1,392 @@
+import pandas as pd
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+# Colunas de cada aba do backup
+PEDIDOS_COLUMNS = [
+    'Nº Pedido', 'Fornecedor', 'País', 'Produto', 'Valor', 'Condição Pagamento',
+    'Data Pedido', 'Leadtime Prometido', 'Data Prometida', 'Data Real', 'Status',
+    'Pagamento', 'Observações', 'ID Pedido'
+]
+FOLLOWUP_COLUMNS = ['Data', 'Fornecedor', 'Pedido', 'Meio', 'SLA Resposta']
+PAGAMENTOS_COLUMNS = [
+    'Pedido', 'Fornecedor', 'Valor Total', 'Valor Pago', 'Data Prevista Pagamento', 'Status',
+    'ID Pagamento'
+]
+
+# Identificador de uma linha nova de pedido ou pagamento. 'Nº Pedido' não é único
+# (várias linhas de produto, fornecedores com a mesma numeração) e parcelas iguais
+# de um pagamento precisam continuar distintas.
+def new_row_id():
+    return uuid.uuid4().hex
+
+# Preenche `coluna_id` nas linhas sem identificador (backups antigos). O ID é
+# derivado do conteúdo e da ordem entre linhas idênticas, então o mesmo backup
+# carregado duas vezes gera os mesmos IDs e linhas idênticas não se fundem.
+def _ensure_row_ids(df, coluna_id, colunas):
+    df = df.copy()
+    if coluna_id not in df.columns:
+        df[coluna_id] = None
+    faltando = df[coluna_id].isna() | (df[coluna_id].astype(str).str.strip() == '')
+    if not faltando.any():
+        return df
+
+    colunas = [c for c in colunas if c in df.columns and c != coluna_id]
+    conteudo = normalize_types(df.loc[faltando, colunas]).map(str).agg('|'.join, axis=1)
+    digest = conteudo.map(lambda texto: hashlib.sha1(texto.encode('utf-8')).hexdigest()[:16])
+    ordem = digest.groupby(digest).cumcount().astype(str)
+    df[coluna_id] = df[coluna_id].astype(object)
+    df.loc[faltando, coluna_id] = digest + '-' + ordem
+    return df
+
+def ensure_order_ids(pedidos_df):
+    return _ensure_row_ids(pedidos_df, 'ID Pedido', PEDIDOS_COLUMNS)
+
+def ensure_payment_ids(pagamentos_df):
+    return _ensure_row_ids(pagamentos_df, 'ID Pagamento', PAGAMENTOS_COLUMNS)
+
+# Função para gerar o backup Excel
+def save_data_to_excel(pedidos_df, followup_df, pagamentos_df, conjunto_id=None):
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        # Salvar cada aba em uma planilha separada
+        pedidos_df.to_excel(writer, sheet_name='Pedidos', index=False)
+        followup_df.to_excel(writer, sheet_name='Follow-ups', index=False)
+        pagamentos_df.to_excel(writer, sheet_name='Pagamentos', index=False)
+
+        # Criar aba de informações
+        info_df = pd.DataFrame({
+            'Informação': ['Última atualização', 'Total de pedidos', 'Total de follow-ups', 'Total de pagamentos',
+                           'ID do conjunto'],
+            'Valor': [
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                len(pedidos_df),
+                len(followup_df),
+                len(pagamentos_df),
+                conjunto_id or ''
+            ]
+        })
+        info_df.to_excel(writer, sheet_name='Info', index=False)
+
+    output.seek(0)
+    return output.getvalue()
+
+# Função para ler um backup Excel; abas ausentes viram tabelas vazias.
+# Devolve também o ID do conjunto de dados (novo se o backup não tiver um válido).
+def load_data_from_excel(excel_file):
+    # Carregar pedidos
+    try:
+        pedidos_df = pd.read_excel(excel_file, sheet_name='Pedidos')
+    except:
+        pedidos_df = pd.DataFrame(columns=PEDIDOS_COLUMNS)
+    pedidos_df = ensure_order_ids(pedidos_df)
+
+    # Carregar follow-ups
+    try:
+        followup_df = pd.read_excel(excel_file, sheet_name='Follow-ups')
+    except:
+        followup_df = pd.DataFrame(columns=FOLLOWUP_COLUMNS)
+
+    # Carregar pagamentos
+    try:
+        pagamentos_df = pd.read_excel(excel_file, sheet_name='Pagamentos')
+    except:
+        pagamentos_df = pd.DataFrame(columns=PAGAMENTOS_COLUMNS)
+    pagamentos_df = ensure_payment_ids(pagamentos_df)
+
+    # Buscar data da última atualização e o ID do conjunto
+    try:
+        info_df = pd.read_excel(excel_file, sheet_name='Info')
+        ultima_atualizacao = info_df[info_df['Informação'] == 'Última atualização']['Valor'].iloc[0]
+    except:
+        info_df = None
+        ultima_atualizacao = 'Data desconhecida'
+
+    try:
+        conjunto_id = str(uuid.UUID(str(
+            info_df[info_df['Informação'] == 'ID do conjunto']['Valor'].iloc[0]
+        )))
+    except:
+        conjunto_id = str(uuid.uuid4())
+
+    return pedidos_df, followup_df, pagamentos_df, ultima_atualizacao, conjunto_id
+
+# Função para calcular KPIs
+def calculate_kpis(pedidos_df, followup_df, hoje=None):
+    if pedidos_df.empty:
+        return {'no_prazo': 0, 'atrasados': 0, 'pag_pendente': 0, 'sla_medio': 0}
+
+    df = pedidos_df.copy()
+    if hoje is None:
+        hoje = datetime.now().date()
+
+    # Converter datas
+    if 'Data Prometida' in df.columns and not df.empty:
+        df['Data Prometida'] = pd.to_datetime(df['Data Prometida'], errors='coerce').dt.date
+        df['Data Real'] = pd.to_datetime(df['Data Real'], errors='coerce').dt.date
+
+    no_prazo = len(df[df['Status'] == 'Entregue'])
+    atrasados = len(df[(df['Data Prometida'] < hoje) & (df['Status'] != 'Entregue')])
+    pag_pendente = len(df[df['Pagamento'].isin(['Não', 'Adiantamento'])])
+
+    # SLA médio
+    if not followup_df.empty:
+        sla_medio = followup_df['SLA Resposta'].mean()
+    else:
+        sla_medio = 0
+
+    return {
+        'no_prazo': no_prazo,
+        'atrasados': atrasados,
+        'pag_pendente': pag_pendente,
+        'sla_medio': round(sla_medio, 1)
+    }
+
+# Pedidos não entregues com data prometida nos próximos `dias` (ou vencida)
+def get_atencao_hoje(pedidos_df, hoje=None, dias=2):
+    colunas = ['Nº Pedido', 'Fornecedor', 'Data Prometida', 'Status']
+    if pedidos_df.empty or 'Data Prometida' not in pedidos_df.columns:
+        return pd.DataFrame(columns=colunas)
+
+    if hoje is None:
+        hoje = datetime.now().date()
+    df = pedidos_df.copy()
+    df['Data Prometida'] = pd.to_datetime(df['Data Prometida'], errors='coerce').dt.date
+    atencao_hoje = df[
+        (df['Data Prometida'] <= hoje + timedelta(days=dias)) &
+        (df['Status'] != 'Entregue')
+    ]
+    return atencao_hoje[colunas]
+
+# Totais de exposição financeira
+def calculate_payment_totals(pagamentos_df):
+    if pagamentos_df.empty:
+        return {'total_adiantado': 0.0, 'total_pendente': 0.0}
+
+    df_pag = pagamentos_df
+    total_adiantado = df_pag[df_pag['Status'].isin(['Pago Parcial', 'Pago'])]['Valor Pago'].sum()
+    total_pendente = df_pag[df_pag['Status'] == 'Pendente']['Valor Total'].sum()
+
+    return {
+        'total_adiantado': float(total_adiantado),
+        'total_pendente': float(total_pendente)
+    }
+
+# ========== ARQUIVO: CAMADAS QUENTE (MEMÓRIA) E FRIA (PARQUET EM DISCO) ==========
+# Layout das partições: <pasta>/<tabela>/mes=AAAA-MM/dados.parquet
+ARQUIVO_TABELAS = {
+    'pedidos': {'colunas': PEDIDOS_COLUMNS, 'chave': ['ID Pedido']},
+    'pagamentos': {'colunas': PAGAMENTOS_COLUMNS, 'chave': ['ID Pagamento']}
+}
+DATE_COLUMNS = ['Data Pedido', 'Data Prometida', 'Data Real', 'Data Prevista Pagamento']
+ID_COLUMNS = ['Nº Pedido', 'Pedido', 'ID Pedido', 'ID Pagamento']
+
+# Sessões do Streamlit são threads do mesmo processo: uma escrita por vez no arquivo
+_ARQUIVO_LOCK = threading.Lock()
+
+# Tipos únicos nas duas camadas: datas como datetime64 e identificadores como texto
+# (o Excel devolve Nº Pedido como int, o formulário como str, o Parquet como str)
+def normalize_types(df):
+    df = df.copy()
+    for coluna in DATE_COLUMNS:
+        if coluna in df.columns:
+            df[coluna] = pd.to_datetime(df[coluna], errors='coerce')
+    for coluna in ID_COLUMNS:
+        if coluna in df.columns:
+            serie = df[coluna]
+            # Números inteiros lidos como float (coluna com vazios) viram "123", não "123.0"
+            if pd.api.types.is_float_dtype(serie) and (serie.dropna() % 1 == 0).all():
+                serie = serie.astype('Int64')
+            df[coluna] = serie.astype(str).where(serie.notna(), None)
+    return df
+
+# Texto livre vindo do Excel mistura tipos (123 numa linha, "texto" na outra), o que
+# o Parquet não aceita. Colunas só com números viram numéricas; as demais, texto.
+def _prepare_for_parquet(df):
+    df = normalize_types(df)
+    for coluna in df.columns:
+        if df[coluna].dtype != object:
+            continue
+        valores = df[coluna].dropna()
+        numericos = valores.map(
+            lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)
+        ).all()
+        if numericos:
+            df[coluna] = pd.to_numeric(df[coluna])
+        else:
+            df[coluna] = df[coluna].map(lambda v: v if v is None or isinstance(v, str) else
+                                        (None if pd.isna(v) else str(v)))
+    return df
+
+# Junta camada fria e quente com os mesmos tipos. Só linhas frias cujo ID também
+# está na camada quente são descartadas (a versão quente prevalece); linhas quentes
+# nunca são deduplicadas entre si.
+def combine_tiers(tabela, df_frio, df_quente):
+    chave = ARQUIVO_TABELAS[tabela]['chave'][0]
+    if tabela == 'pagamentos':
+        df_quente = ensure_payment_ids(df_quente)
+    else:
+        df_quente = ensure_order_ids(df_quente)
+    df_quente = normalize_types(df_quente)
+    if df_frio.empty:
+        return df_quente
+    df_frio = normalize_types(df_frio)
+    df_frio = df_frio[~df_frio[chave].isin(df_quente[chave].dropna())]
+    if df_quente.empty:
+        return df_frio.reset_index(drop=True)
+    return pd.concat([df_frio, df_quente], ignore_index=True)
+
+# Pasta do arquivo de um conjunto de dados; o ID vem do backup e precisa ser um UUID
+def dataset_archive_dir(base, conjunto_id):
+    return Path(base) / str(uuid.UUID(str(conjunto_id)))
+
+# Mês (AAAA-MM) de cada linha a partir de uma coluna de data; inválidas viram None
+def _month_of(serie):
+    datas = pd.to_datetime(serie, errors='coerce')
+    return datas.dt.strftime('%Y-%m').where(datas.notna(), None)
+
+# Separa registros encerrados de meses anteriores ao atual (camada fria) dos demais
+def split_hot_cold(pedidos_df, pagamentos_df, hoje=None):
+    if hoje is None:
+        hoje = datetime.now().date()
+    mes_atual = hoje.strftime('%Y-%m')
+
+    # Pedidos: entregues e totalmente pagos. Só vão para o arquivo linhas com ID
+    # presente e único, para que nenhuma linha substitua outra na partição.
+    pedidos_df = ensure_order_ids(pedidos_df)
+    id_valido = pedidos_df['ID Pedido'].notna() & ~pedidos_df['ID Pedido'].duplicated(keep=False)
+    mes_pedido = _month_of(pedidos_df['Data Pedido']) if 'Data Pedido' in pedidos_df.columns \
+        else pd.Series(None, index=pedidos_df.index, dtype=object)
+    fechados = (
+        (pedidos_df.get('Status') == 'Entregue') &
+        (pedidos_df.get('Pagamento') == 'Sim') &
+        mes_pedido.notna() &
+        (mes_pedido < mes_atual) &
+        id_valido
+    ) if not pedidos_df.empty else pd.Series(False, index=pedidos_df.index)
+
+    frio_pedidos = pedidos_df[fechados].assign(mes=mes_pedido[fechados])
+    quente_pedidos = pedidos_df[~fechados]
+
+    # Pagamentos: quitados e sem pedido aberto; o mês vem do pedido, ou da data prevista
+    pagamentos_df = ensure_payment_ids(pagamentos_df)
+    if pagamentos_df.empty:
+        return quente_pedidos, pagamentos_df, frio_pedidos, pagamentos_df.assign(mes=None)
+
+    numeros = pedidos_df['Nº Pedido'].astype(str) if 'Nº Pedido' in pedidos_df.columns \
+        else pd.Series(dtype=str)
+    mes_por_pedido = dict(zip(numeros, mes_pedido))
+    abertos = set(numeros[~fechados])
+
+    pedido_pag = pagamentos_df['Pedido'].astype(str)
+    mes_pag = pedido_pag.map(mes_por_pedido)
+    if 'Data Prevista Pagamento' in pagamentos_df.columns:
+        mes_pag = mes_pag.fillna(_month_of(pagamentos_df['Data Prevista Pagamento']))
+    id_pag_valido = pagamentos_df['ID Pagamento'].notna() & \
+        ~pagamentos_df['ID Pagamento'].duplicated(keep=False)
+    quitados = (
+        id_pag_valido &
+        (pagamentos_df['Status'] == 'Pago') &
+        ~pedido_pag.isin(abertos) &
+        mes_pag.notna() &
+        (mes_pag < mes_atual)
+    )
+
+    frio_pagamentos = pagamentos_df[quitados].assign(mes=mes_pag[quitados])
+    quente_pagamentos = pagamentos_df[~quitados]
+
+    return quente_pedidos, quente_pagamentos, frio_pedidos, frio_pagamentos
+
+# Acrescenta registros às partições mensais. Uma linha já arquivada só é substituída
+# pela linha nova de mesmo ID; as linhas novas não são deduplicadas entre si.
+# Cada partição é regravada num arquivo temporário e trocada com os.replace, então
+# uma falha no meio da escrita nunca deixa um dados.parquet corrompido.
+def write_cold_partitions(df, tabela, pasta):
+    chave = ARQUIVO_TABELAS[tabela]['chave']
+    with _ARQUIVO_LOCK:
+        for mes, grupo in df.groupby('mes'):
+            particao = Path(pasta) / tabela / f"mes={mes}"
+            particao.mkdir(parents=True, exist_ok=True)
+            arquivo = particao / 'dados.parquet'
+
+            novos = normalize_types(grupo.drop(columns='mes'))
+            if arquivo.exists():
+                existentes = pd.read_parquet(arquivo)
+                existentes = existentes[~existentes[chave[0]].isin(novos[chave[0]])]
+                novos = pd.concat([existentes, novos], ignore_index=True)
+            novos = _prepare_for_parquet(novos)
+
+            fd, temporario = tempfile.mkstemp(dir=particao, prefix='.dados-', suffix='.parquet')
+            os.close(fd)
+            try:
+                novos.to_parquet(temporario, index=False)
+                os.replace(temporario, arquivo)
+            except:
+                os.remove(temporario)
+                raise
+
+# Move os registros encerrados para a camada fria e devolve apenas a camada quente
+def archive_closed(pedidos_df, pagamentos_df, pasta, hoje=None):
+    quente_pedidos, quente_pagamentos, frio_pedidos, frio_pagamentos = split_hot_cold(
+        pedidos_df, pagamentos_df, hoje
+    )
+
+    if not frio_pedidos.empty:
+        write_cold_partitions(frio_pedidos, 'pedidos', pasta)
+    if not frio_pagamentos.empty:
+        write_cold_partitions(frio_pagamentos, 'pagamentos', pasta)
+
+    return (
+        quente_pedidos.reset_index(drop=True),
+        quente_pagamentos.reset_index(drop=True),
+        len(frio_pedidos),
+        len(frio_pagamentos)
+    )
+
+# Apaga a camada fria de uma tabela (ou de todas) de um conjunto de dados
+def clear_cold(pasta, tabela=None):
+    with _ARQUIVO_LOCK:
+        for nome in ([tabela] if tabela else list(ARQUIVO_TABELAS)):
+            shutil.rmtree(Path(pasta) / nome, ignore_errors=True)
+
+# Meses (AAAA-MM) disponíveis na camada fria, em ordem
+def list_cold_months(tabela, pasta):
+    raiz = Path(pasta) / tabela
+    if not raiz.is_dir():
+        return []
+    return sorted(
+        p.name.split('=', 1)[1] for p in raiz.iterdir()
+        if p.is_dir() and p.name.startswith('mes=') and (p / 'dados.parquet').exists()
+    )
+
+# Lê a camada fria apenas nas partições do intervalo [inicio, fim] (AAAA-MM)
+def load_cold(tabela, pasta, inicio=None, fim=None):
+    meses = [
+        mes for mes in list_cold_months(tabela, pasta)
+        if (inicio is None or mes >= inicio) and (fim is None or mes <= fim)
+    ]
+    if not meses:
+        return pd.DataFrame(columns=ARQUIVO_TABELAS[tabela]['colunas'])
+
+    return pd.concat([
+        pd.read_parquet(Path(pasta) / tabela / f"mes={mes}" / 'dados.parquet')
+        for mes in meses
+    ], ignore_index=True)
+
+# Quantidade de linhas arquivadas antes do mês `antes_de` (AAAA-MM), lida dos
+# metadados do Parquet, sem carregar os dados
+def count_cold(tabela, pasta, antes_de=None):
+    return sum(
+        pq.read_metadata(Path(pasta) / tabela / f"mes={mes}" / 'dados.parquet').num_rows
+        for mes in list_cold_months(tabela, pasta)
+        if antes_de is None or mes < antes_de
+    )
@@ -0,0 +1,173 @@
+"""Relatório noturno de KPIs sem navegador.
+
+Uso:
+    python relatorio.py backup1.xlsx backups/ --saida relatorios --formato excel json
+
+Cada backup Excel (ou todos os .xlsx/.xls de uma pasta) gera um relatório com
+os KPIs do Cockpit, a lista "Atenção Hoje" e a exposição financeira.
+Vários arquivos são processados em paralelo, um processo por núcleo.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from pedidos_core import (
+    calculate_kpis,
+    calculate_payment_totals,
+    combine_tiers,
+    dataset_archive_dir,
+    get_atencao_hoje,
+    load_cold,
+    load_data_from_excel,
+)
+
+FORMATOS = ['excel', 'parquet', 'json']
+
+# Expande pastas em arquivos de backup (cada arquivo aparece uma vez só)
+def find_backups(caminhos):
+    arquivos = []
+    vistos = set()
+    for caminho in map(Path, caminhos):
+        if caminho.is_dir():
+            encontrados = sorted(
+                p for p in caminho.iterdir() if p.suffix.lower() in ('.xlsx', '.xls')
+            )
+        else:
+            encontrados = [caminho]
+        for arquivo in encontrados:
+            if arquivo.resolve() not in vistos:
+                vistos.add(arquivo.resolve())
+                arquivos.append(arquivo)
+    return arquivos
+
+# Nome do relatório de cada backup: o nome do arquivo, prefixado pelas pastas mais
+# próximas quando dois backups têm o mesmo nome (os processos paralelos não podem
+# gravar no mesmo destino)
+def report_names(arquivos):
+    pastas = [arquivo.resolve().parent.parts[1:] for arquivo in arquivos]
+    nomes = [arquivo.stem for arquivo in arquivos]
+    profundidade = 0
+    limite = max(len(p) for p in pastas)
+    while len(set(nomes)) < len(nomes):
+        profundidade += 1
+        if profundidade > limite:
+            # Mesma pasta e mesmo nome (ex.: .xlsx e .xls): distingue pela extensão
+            return [
+                f"{nome}_{arquivo.suffix.lstrip('.').lower()}" if nomes.count(nome) > 1 else nome
+                for arquivo, nome in zip(arquivos, nomes)
+            ]
+        repetidos = {nome for nome in nomes if nomes.count(nome) > 1}
+        nomes = [
+            '_'.join(pastas[i][-profundidade:] + (arquivo.stem,)) if nome in repetidos else nome
+            for i, (arquivo, nome) in enumerate(zip(arquivos, nomes))
+        ]
+    return nomes
+
+# Valores ausentes (NaN/NaT) viram null: json.dump escreveria NaN, que não é JSON válido
+def _json_value(valor):
+    if valor is pd.NaT or (isinstance(valor, float) and math.isnan(valor)):
+        return None
+    return valor
+
+# Calcula o relatório de um backup e grava nos formatos pedidos
+def process_backup(arquivo, saida, formatos, pasta_arquivo=None, nome=None):
+    arquivo = Path(arquivo)
+    saida = Path(saida)
+    pedidos_df, followup_df, pagamentos_df, ultima_atualizacao, conjunto_id = load_data_from_excel(arquivo)
+
+    # Inclui o histórico arquivado (camada fria) do conjunto deste backup nos KPIs;
+    # registros presentes no backup e no arquivo contam uma vez só
+    if pasta_arquivo is not None:
+        pasta = dataset_archive_dir(pasta_arquivo, conjunto_id)
+        pedidos_df = combine_tiers('pedidos', load_cold('pedidos', pasta), pedidos_df)
+        pagamentos_df = combine_tiers('pagamentos', load_cold('pagamentos', pasta), pagamentos_df)
+
+    kpis = calculate_kpis(pedidos_df, followup_df)
+    pagamentos = calculate_payment_totals(pagamentos_df)
+    atencao_hoje = get_atencao_hoje(pedidos_df)
+    resumo = {
+        'Arquivo': arquivo.name,
+        'Última atualização': str(ultima_atualizacao),
+        'Gerado em': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        **kpis,
+        **pagamentos
+    }
+
+    gerados = []
+    base = saida / f"{nome or arquivo.stem}_relatorio"
+
+    if 'excel' in formatos:
+        destino = base.with_suffix('.xlsx')
+        with pd.ExcelWriter(destino, engine='xlsxwriter') as writer:
+            pd.DataFrame([resumo]).to_excel(writer, sheet_name='KPIs', index=False)
+            atencao_hoje.to_excel(writer, sheet_name='Atenção Hoje', index=False)
+        gerados.append(destino)
+
+    if 'parquet' in formatos:
+        destino_kpis = base.parent / f"{base.name}_kpis.parquet"
+        destino_atencao = base.parent / f"{base.name}_atencao.parquet"
+        pd.DataFrame([resumo]).to_parquet(destino_kpis, index=False)
+        atencao_hoje.astype({'Nº Pedido': str}).to_parquet(destino_atencao, index=False)
+        gerados.extend([destino_kpis, destino_atencao])
+
+    if 'json' in formatos:
+        destino = base.with_suffix('.json')
+        relatorio = {
+            **{chave: _json_value(valor) for chave, valor in resumo.items()},
+            'atencao_hoje': [
+                {chave: _json_value(valor) for chave, valor in registro.items()}
+                for registro in atencao_hoje.to_dict(orient='records')
+            ]
+        }
+        with open(destino, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2, default=str, allow_nan=False)
+        gerados.append(destino)
+
+    return [str(p) for p in gerados]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gera relatórios de KPIs a partir de backups Excel.")
+    parser.add_argument('backups', nargs='+', help="Arquivos de backup (.xlsx) ou pastas contendo backups")
+    parser.add_argument('--saida', default='relatorios', help="Pasta de destino dos relatórios")
+    parser.add_argument('--formato', nargs='+', choices=FORMATOS, default=FORMATOS,
+                        help="Formatos de saída (padrão: todos)")
+    parser.add_argument('--processos', type=int, default=os.cpu_count(),
+                        help="Número de processos paralelos (padrão: núcleos da CPU)")
+    parser.add_argument('--arquivo', default=None,
+                        help="Pasta base do arquivo de registros encerrados a incluir nos KPIs")
+    args = parser.parse_args(argv)
+
+    arquivos = find_backups(args.backups)
+    if not arquivos:
+        print("❌ Nenhum arquivo de backup encontrado", file=sys.stderr)
+        return 1
+
+    nomes = report_names(arquivos)
+    Path(args.saida).mkdir(parents=True, exist_ok=True)
+    processos = max(1, min(args.processos or 1, len(arquivos)))
+
+    falhas = 0
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {
+            executor.submit(process_backup, arquivo, args.saida, args.formato, args.arquivo, nome): arquivo
+            for arquivo, nome in zip(arquivos, nomes)
+        }
+        for futuro, arquivo in futuros.items():
+            try:
+                for gerado in futuro.result():
+                    print(f"✅ {arquivo} → {gerado}")
+            except Exception as e:
+                falhas += 1
+                print(f"❌ Erro ao processar {arquivo}: {str(e)}", file=sys.stderr)
+
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+from datetime import date
+
+import pandas as pd
+
+import pedidos_core as core
+
+HOJE = date(2024, 6, 15)
+ANTIGO = date(2024, 1, 10)
+
+
+def pedido(numero, fornecedor='F', produto='x', status='Entregue', pagamento='Sim',
+           data=ANTIGO, observacoes='', **extra):
+    linha = dict(zip(core.PEDIDOS_COLUMNS, [
+        numero, fornecedor, 'China', produto, 10.0, '30 dias', data, 30, data, data,
+        status, pagamento, observacoes, None
+    ]))
+    linha.update(extra)
+    return linha
+
+
+def pagamento(numero, valor_pago=50.0, status='Pago', data=ANTIGO):
+    return {'Pedido': numero, 'Fornecedor': 'F', 'Valor Total': 100.0, 'Valor Pago': valor_pago,
+            'Data Prevista Pagamento': data, 'Status': status}
+
+
+def pagamentos_vazios():
+    return pd.DataFrame(columns=core.PAGAMENTOS_COLUMNS)
+
+
+# ---------- split_hot_cold ----------
+
+def test_split_moves_only_closed_orders_from_previous_months():
+    pedidos = pd.DataFrame([
+        pedido(1),                                  # encerrado, mês anterior
+        pedido(2, data=HOJE),                       # encerrado, mês atual
+        pedido(3, status='Pendente'),               # aberto
+        pedido(4, pagamento='Adiantamento'),        # não pago
+    ])
+    quente, _, frio, _ = core.split_hot_cold(pedidos, pagamentos_vazios(), HOJE)
+
+    assert list(frio['Nº Pedido']) == [1]
+    assert list(frio['mes']) == ['2024-01']
+    assert sorted(quente['Nº Pedido']) == [2, 3, 4]
+
+
+def test_split_keeps_rows_with_duplicate_ids_hot():
+    pedidos = pd.DataFrame([pedido(1, **{'ID Pedido': 'a'}), pedido(2, **{'ID Pedido': 'a'})])
+    quente, _, frio, _ = core.split_hot_cold(pedidos, pagamentos_vazios(), HOJE)
+
+    assert frio.empty
+    assert len(quente) == 2
+
+
+def test_split_keeps_payments_of_open_orders_hot():
+    pedidos = pd.DataFrame([pedido(1), pedido(2, status='Pendente')])
+    pagamentos = pd.DataFrame([pagamento(1), pagamento(2)])
+    _, quente_pag, _, frio_pag = core.split_hot_cold(pedidos, pagamentos, HOJE)
+
+    assert list(frio_pag['Pedido']) == [1]
+    assert list(quente_pag['Pedido']) == [2]
+
+
+# ---------- combine_tiers ----------
+
+def test_combine_never_deduplicates_hot_rows():
+    # Um pedido com duas linhas de produto compartilha o Nº Pedido
+    quente = pd.DataFrame([pedido(1001, produto='X'), pedido(1001, produto='Y')])
+    combinado = core.combine_tiers('pedidos', pd.DataFrame(columns=core.PEDIDOS_COLUMNS), quente)
+
+    assert sorted(combinado['Produto']) == ['X', 'Y']
+
+
+def test_combine_drops_cold_rows_that_are_also_hot():
+    quente = core.ensure_order_ids(pd.DataFrame([pedido(1, observacoes='novo'), pedido(2)]))
+    frio = core.normalize_types(pd.concat([quente.iloc[[0]].assign(**{'Observações': 'antigo'}),
+                                           pd.DataFrame([pedido(3, **{'ID Pedido': 'c'})])]))
+    combinado = core.combine_tiers('pedidos', frio, quente)
+
+    assert len(combinado) == 3
+    assert combinado.loc[combinado['Nº Pedido'] == '1', 'Observações'].tolist() == ['novo']
+
+
+def test_combine_normalizes_types_of_both_tiers():
+    quente = pd.DataFrame([pedido(7, data=HOJE)])
+    frio = core.normalize_types(pd.DataFrame([pedido('8', **{'ID Pedido': 'b'})]))
+    combinado = core.combine_tiers('pedidos', frio, quente)
+
+    assert combinado['Nº Pedido'].tolist() == ['8', '7']
+    assert pd.api.types.is_datetime64_any_dtype(combinado['Data Pedido'])
+
+
+# ---------- write_cold_partitions / archive_closed ----------
+
+def test_archive_keeps_orders_sharing_a_number(tmp_path):
+    pedidos = pd.DataFrame([pedido(500, fornecedor='A'), pedido(500, fornecedor='B'),
+                            pedido(None, produto='p'), pedido(None, produto='q')])
+    quente, _, n_pedidos, _ = core.archive_closed(pedidos, pagamentos_vazios(), tmp_path, HOJE)
+
+    assert n_pedidos == 4
+    assert quente.empty
+    assert len(core.load_cold('pedidos', tmp_path)) == 4
+
+
+def test_archive_keeps_identical_installments(tmp_path):
+    pagamentos = pd.DataFrame([pagamento(1), pagamento(1)])
+    core.archive_closed(pd.DataFrame([pedido(1)]), pagamentos, tmp_path, HOJE)
+
+    assert core.load_cold('pagamentos', tmp_path)['Valor Pago'].sum() == 100.0
+
+
+def test_archiving_same_rows_again_does_not_duplicate(tmp_path):
+    pedidos = core.ensure_order_ids(pd.DataFrame([pedido(1), pedido(2)]))
+    core.archive_closed(pedidos, pagamentos_vazios(), tmp_path, HOJE)
+    core.archive_closed(pedidos, pagamentos_vazios(), tmp_path, HOJE)
+
+    assert len(core.load_cold('pedidos', tmp_path)) == 2
+    assert core.count_cold('pedidos', tmp_path) == 2
+
+
+def test_write_handles_mixed_type_free_text(tmp_path):
+    pedidos = pd.DataFrame([pedido(1, observacoes=123), pedido(2, observacoes='texto')])
+    core.archive_closed(pedidos, pagamentos_vazios(), tmp_path, HOJE)
+    # Uma segunda gravação na mesma partição, agora só com números
+    core.archive_closed(pd.DataFrame([pedido(3, observacoes=7)]), pagamentos_vazios(), tmp_path, HOJE)
+
+    frio = core.load_cold('pedidos', tmp_path)
+    assert sorted(frio['Observações'].tolist()) == ['123', '7', 'texto']
+    assert not list((tmp_path / 'pedidos' / 'mes=2024-01').glob('.dados-*'))
+
+
+def test_clear_cold_and_count_by_month(tmp_path):
+    pedidos = pd.DataFrame([pedido(1), pedido(2, data=date(2024, 3, 5))])
+    pagamentos = pd.DataFrame([pagamento(1)])
+    core.archive_closed(pedidos, pagamentos, tmp_path, HOJE)
+
+    assert core.list_cold_months('pedidos', tmp_path) == ['2024-01', '2024-03']
+    assert core.count_cold('pedidos', tmp_path, antes_de='2024-03') == 1
+
+    core.clear_cold(tmp_path, 'pedidos')
+    assert core.list_cold_months('pedidos', tmp_path) == []
+    assert core.list_cold_months('pagamentos', tmp_path) == ['2024-01']